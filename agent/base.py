@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import json
 import os
+import shlex
 import subprocess
 import traceback
 from datetime import datetime
 from functools import partial
+from operator import itemgetter
 from typing import TYPE_CHECKING
 
 import redis
@@ -45,7 +47,11 @@ class Base:
         directory = directory or self.directory
         start = datetime.now()
         self.skip_output_log = skip_output_log
-        self.data = get_execution_result(command, directory, start)
+        self.data = get_execution_result(
+            command if isinstance(command, str) else shlex.join(command),
+            directory,
+            start,
+        )
         self.log()
         output = ""
         try:
@@ -83,13 +89,14 @@ class Base:
 
     def run_subprocess(self, command, directory, input, executable, non_zero_throw=True):
         # Start a child process and start reading output immediately
+        # Commands passed as an argv list are run without a shell
         with subprocess.Popen(
             command,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             stdin=subprocess.PIPE if input else None,
             cwd=directory,
-            shell=True,
+            shell=isinstance(command, str),
             executable=executable,
         ) as process:
             if input:
@@ -200,19 +207,16 @@ class Base:
         def path(file):
             return os.path.join(self.logs_directory, file)
 
-        def modified_time(file):
-            return os.path.getctime(path(file))
-
         try:
-            log_files = sorted(
-                os.listdir(self.logs_directory),
-                key=modified_time,
-                reverse=True,
-            )
-            payload = []
-
-            for x in log_files:
+            # Stat each file once and sort on the collected ctime
+            log_files = []
+            for x in os.listdir(self.logs_directory):
                 stats = os.stat(path(x))
+                log_files.append((stats.st_ctime, x, stats))
+            log_files.sort(key=itemgetter(0), reverse=True)
+
+            payload = []
+            for _, x, stats in log_files:
                 payload.append(
                     {
                         "name": x,
@@ -228,7 +232,13 @@ class Base:
             return []
 
     def retrieve_log(self, name):
-        if name not in {x["name"] for x in self.logs}:
+        # Only the file names are needed here, self.logs would stat every file
+        try:
+            log_files = set(os.listdir(self.logs_directory))
+        except FileNotFoundError:
+            return ""
+
+        if name not in log_files:
             return ""
         log_file = os.path.join(self.logs_directory, name)
         with open(log_file) as lf:
@@ -3,16 +3,20 @@ from __future__ import annotations
 import hashlib
 import json
 import os
+import re
 import shutil
 import string
 import tempfile
 import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
 from datetime import datetime, timedelta
 from functools import partial
 from glob import glob
 from pathlib import Path, PurePath
 from random import choices
+from shlex import quote
 from textwrap import indent
 from typing import TYPE_CHECKING, TypedDict
 
@@ -40,6 +44,10 @@ if TYPE_CHECKING:
         migrate_sites: bool
 
 
+DB_NAME_PATTERN = re.compile(r'("db_name":.* ")(\w*)(")')
+DB_PASSWORD_PATTERN = re.compile(r'("db_password":.* ")(\w*)(")')
+
+
 class Bench(Base):
     def __init__(self, name: str, server: Server, mounts=None):
         self.name = name
@@ -54,6 +62,7 @@ class Bench(Base):
         self.host = self.config.get("db_host", "localhost")
         self.docker_image = self.bench_config.get("docker_image")
         self.mounts = mounts
+        self._container: str | None = None
         if not (
             os.path.isdir(self.directory)
             and os.path.exists(self.sites_directory)
@@ -121,9 +130,11 @@ class Bench(Base):
             reverse=True,
         )
 
+        usage_by_site = _group_usage_by_site(usage_data)
         for site in self.sites.values():
+            site_usage = usage_by_site.get(site.name, [])
             try:
-                timezone_data = {d["timestamp"]: d["timezone"] for d in usage_data if d["site"] == site.name}
+                timezone_data = {d["timestamp"]: d["timezone"] for d in site_usage}
                 timezone = timezone_data[max(timezone_data)]
             except Exception:
                 timezone = None
@@ -141,8 +152,7 @@ class Bench(Base):
                         "backups": d["backups"],
                         "timestamp": d["timestamp"],
                     }
-                    for d in usage_data
-                    if d["site"] == site.name
+                    for d in site_usage
                 ],
                 "timezone": timezone,
             }
@@ -174,16 +184,26 @@ class Bench(Base):
         if subdir:
             workdir = os.path.join(workdir, subdir)
 
-        if self.bench_config.get("single_container"):
-            command = f"docker exec -w {workdir} " f"{interactive} {self.name} {command}"
-        else:
-            service = f"{self.name}_worker_default"
-            task = self.execute("docker service ps -f desired-state=Running -q --no-trunc " f"{service}")[
-                "output"
-            ].split()[0]
-            command = f"docker exec -w {workdir} " f"{interactive} {service}.1.{task} {command}"
+        container = self._get_container()
+        command = f"docker exec -w {workdir} " f"{interactive} {container} {command}"
         return self.execute(command, input=input, non_zero_throw=non_zero_throw)
 
+    def _get_container(self) -> str:
+        if self._container:
+            return self._container
+
+        if self.bench_config.get("single_container"):
+            # Container is named after the bench, no need to re-read config
+            self._container = self.name
+            return self._container
+
+        # Swarm can reschedule the task at any time, look it up on every call
+        service = f"{self.name}_worker_default"
+        task = self.execute("docker service ps -f desired-state=Running -q --no-trunc " f"{service}")[
+            "output"
+        ].split()[0]
+        return f"{service}.1.{task}"
+
     @step("New Site")
     def bench_new_site(self, name, mariadb_root_password, admin_password):
         site_database, temp_user, temp_password = self.create_mariadb_user(name, mariadb_root_password)
@@ -265,9 +285,10 @@ class Bench(Base):
             f"GRANT ALL ON {database}.* TO '{user}'@'%' WITH GRANT OPTION",
             "FLUSH PRIVILEGES",
         ]
-        for query in queries:
-            command = f"mysql -h {self.host} -uroot -p{mariadb_root_password}" f' -e "{query}"'
-            self.execute(command)
+        # Run all statements over a single connection
+        query = "; ".join(queries)
+        command = f"mysql -h {self.host} -uroot -p{mariadb_root_password}" f' -e "{query}"'
+        self.execute(command)
         return database, user, password
 
     def drop_mariadb_user(self, site, mariadb_root_password, database=None):
@@ -278,9 +299,10 @@ class Bench(Base):
             f"DROP USER IF EXISTS '{user}'@'%'",
             "FLUSH PRIVILEGES",
         ]
-        for query in queries:
-            command = f"mysql -h {self.host} -uroot -p{mariadb_root_password}" f' -e "{query}"'
-            self.execute(command)
+        # Run all statements over a single connection
+        query = "; ".join(queries)
+        command = f"mysql -h {self.host} -uroot -p{mariadb_root_password}" f' -e "{query}"'
+        self.execute(command)
 
     def fetch_monitor_data(self):
         lines = []
@@ -299,7 +321,8 @@ class Bench(Base):
                 shutil.move(monitor_log_file, target_file)
 
                 with open(target_file) as f:
-                    for line in f.readlines():
+                    # Stream lines instead of loading the whole log into a list
+                    for line in f:
                         try:
                             lines.append(json.loads(line))
                         except Exception:
@@ -455,16 +478,24 @@ class Bench(Base):
         return self.server._reload_nginx()
 
     def _set_sites_host(self, sites: list[Site]):
+        # server.wildcards lists the hosts directory, fetch it once and look
+        # up each parent domain of a site instead of scanning all wildcards
+        wildcards = set(self.server.wildcards)
         for site in sites:
-            for wildcard_domain in self.server.wildcards:
-                if site.name.endswith("." + wildcard_domain):
+            labels = site.name.split(".")
+            for i in range(1, len(labels)):
+                wildcard_domain = ".".join(labels[i:])
+                if wildcard_domain in wildcards:
                     site.host = "*." + wildcard_domain
+                    break
 
     def generate_nginx_config(self):
         sites = [s for s in self.valid_sites.values()]
         domains = _get_domains(sites)
+        bench_config = self.bench_config
+        server_config = self.server.config
 
-        if standalone := self.server.config.get("standalone"):
+        if standalone := server_config.get("standalone"):
             self._set_sites_host(sites)
 
         codeserver = _get_codeserver_config(self.directory)
@@ -472,17 +503,17 @@ class Bench(Base):
         config = {
             "bench_name": self.name,
             "bench_name_slug": self.name.replace("-", "_"),
-            "domain": self.server.config.get("domain"),
+            "domain": server_config.get("domain"),
             "sites": sites,
             "domains": domains,
-            "http_timeout": self.bench_config["http_timeout"],
-            "web_port": self.bench_config["web_port"],
-            "socketio_port": self.bench_config["socketio_port"],
+            "http_timeout": bench_config["http_timeout"],
+            "web_port": bench_config["web_port"],
+            "socketio_port": bench_config["socketio_port"],
             "sites_directory": self.sites_directory,
             "standalone": standalone,
             "error_pages_directory": self.server.error_pages_directory,
             "nginx_directory": self.server.nginx_directory,
-            "tls_protocols": self.server.config.get("tls_protocols"),
+            "tls_protocols": server_config.get("tls_protocols"),
             "code_server": codeserver,
         }
         nginx_config = os.path.join(self.directory, "nginx.conf")
@@ -570,28 +601,28 @@ class Bench(Base):
     @step("Update Supervisor Configuration")
     def update_supervisor(self):
         self.generate_supervisor_config()
-        self.docker_execute("supervisorctl reread")
-        self.docker_execute("supervisorctl update")
+        self.docker_execute("sh -c 'supervisorctl reread && supervisorctl update'")
 
     def generate_supervisor_config(self):
         supervisor_config = os.path.join(self.directory, "config", "supervisor.conf")
+        bench_config = self.bench_config
         self.server._render_template(
             "bench/supervisor.conf",
             {
-                "background_workers": self.bench_config["background_workers"],
-                "gunicorn_workers": self.bench_config["gunicorn_workers"],
-                "http_timeout": self.bench_config["http_timeout"],
+                "background_workers": bench_config["background_workers"],
+                "gunicorn_workers": bench_config["gunicorn_workers"],
+                "http_timeout": bench_config["http_timeout"],
                 "name": self.name,
-                "statsd_host": self.bench_config["statsd_host"],
-                "is_ssh_enabled": self.bench_config.get("is_ssh_enabled", False),
-                "merge_all_rq_queues": self.bench_config.get("merge_all_rq_queues", False),
-                "merge_default_and_short_rq_queues": self.bench_config.get(
+                "statsd_host": bench_config["statsd_host"],
+                "is_ssh_enabled": bench_config.get("is_ssh_enabled", False),
+                "merge_all_rq_queues": bench_config.get("merge_all_rq_queues", False),
+                "merge_default_and_short_rq_queues": bench_config.get(
                     "merge_default_and_short_rq_queues", False
                 ),
-                "use_rq_workerpool": self.bench_config.get("use_rq_workerpool", False),
-                "environment_variables": self.bench_config.get("environment_variables"),
-                "gunicorn_threads_per_worker": self.bench_config.get("gunicorn_threads_per_worker"),
-                "is_code_server_enabled": self.bench_config.get("is_code_server_enabled", False),
+                "use_rq_workerpool": bench_config.get("use_rq_workerpool", False),
+                "environment_variables": bench_config.get("environment_variables"),
+                "gunicorn_threads_per_worker": bench_config.get("gunicorn_threads_per_worker"),
+                "is_code_server_enabled": bench_config.get("is_code_server_enabled", False),
             },
             supervisor_config,
         )
@@ -655,15 +686,21 @@ class Bench(Base):
         shutil.rmtree(code_server_path)
         self.docker_execute("supervisorctl stop code-server:")
 
-    def prepare_mounts_on_host(self, bench_directory):
-        mounts_cmd = ""
+    def prepare_mounts_on_host(self, bench_directory) -> list[str]:
+        mounts_args = []
 
         if not self.mounts:
-            return mounts_cmd
+            return mounts_args
+
+        # Several mounts can share a source, only check each path once
+        created = set()
 
         def _create_mounts(host_path):
+            if host_path in created:
+                return
             if not os.path.exists(host_path):
                 os.mkdir(host_path)
+            created.add(host_path)
 
         for mp in self.mounts:
             host_path = mp["source"]
@@ -679,37 +716,57 @@ class Bench(Base):
 
                 _create_mounts(host_path)
 
-            mounts_cmd += f" -v {host_path}:{destination_path} "
+            mounts_args.extend(["-v", f"{host_path}:{destination_path}"])
 
-        return mounts_cmd
+        return mounts_args
 
     def start(self):
-        if self.bench_config.get("single_container"):
+        self._container = None
+        bench_config = self.bench_config
+        if bench_config.get("single_container"):
             try:
                 self.execute(f"docker stop {self.name}")
                 self.execute(f"docker rm {self.name}")
             except Exception:
                 pass
 
-            ssh_port = self.bench_config.get("ssh_port", self.bench_config["web_port"] + 4000)
-            ssh_ip = self.bench_config.get("private_ip", "127.0.0.1")
+            ssh_port = bench_config.get("ssh_port", bench_config["web_port"] + 4000)
+            ssh_ip = bench_config.get("private_ip", "127.0.0.1")
 
             bench_directory = "/home/frappe/frappe-bench"
             mounts = self.prepare_mounts_on_host(bench_directory)
 
-            command = (
-                "docker run -d --init -u frappe "
-                f"--restart always --hostname {self.name} "
-                f"-p 127.0.0.1:{self.bench_config['web_port']}:8000 "
-                f"-p 127.0.0.1:{self.bench_config['socketio_port']}:9000 "
-                f"-p 127.0.0.1:{self.bench_config['codeserver_port']}:8088 "
-                f"-p {ssh_ip}:{ssh_port}:2200 "
-                f"-v {self.sites_directory}:{bench_directory}/sites "
-                f"-v {self.logs_directory}:{bench_directory}/logs "
-                f"-v {self.config_directory}:{bench_directory}/config "
-                f"{ mounts } "
-                f"--name {self.name} {self.bench_config['docker_image']}"
-            )
+            # Pass argv directly, no shell is needed to parse the command
+            command = [
+                "docker",
+                "run",
+                "-d",
+                "--init",
+                "-u",
+                "frappe",
+                "--restart",
+                "always",
+                "--hostname",
+                self.name,
+                "-p",
+                f"127.0.0.1:{bench_config['web_port']}:8000",
+                "-p",
+                f"127.0.0.1:{bench_config['socketio_port']}:9000",
+                "-p",
+                f"127.0.0.1:{bench_config['codeserver_port']}:8088",
+                "-p",
+                f"{ssh_ip}:{ssh_port}:2200",
+                "-v",
+                f"{self.sites_directory}:{bench_directory}/sites",
+                "-v",
+                f"{self.logs_directory}:{bench_directory}/logs",
+                "-v",
+                f"{self.config_directory}:{bench_directory}/config",
+                *mounts,
+                "--name",
+                self.name,
+                bench_config["docker_image"],
+            ]
         else:
             command = (
                 "docker stack deploy "
@@ -719,6 +776,7 @@ class Bench(Base):
         return self.execute(command)
 
     def stop(self):
+        self._container = None
         if self.bench_config.get("single_container"):
             self.execute(f"docker stop {self.name}")
             return self.execute(f"docker rm {self.name}")
@@ -739,10 +797,11 @@ class Bench(Base):
         self._start()
 
     def update_runtime_limits(self):
-        memory_high = self.bench_config.get("memory_high")
-        memory_max = self.bench_config.get("memory_max")
-        memory_swap = self.bench_config.get("memory_swap")
-        vcpu = self.bench_config.get("vcpu")
+        bench_config = self.bench_config
+        memory_high = bench_config.get("memory_high")
+        memory_max = bench_config.get("memory_max")
+        memory_swap = bench_config.get("memory_swap")
+        vcpu = bench_config.get("vcpu")
         if not any([memory_high, memory_max, memory_swap, vcpu]):
             return
         self._update_runtime_limits(memory_high, memory_max, memory_swap, vcpu)
@@ -766,10 +825,8 @@ class Bench(Base):
 
     def readable_jde_err(self, title: str, jde: json.decoder.JSONDecodeError) -> str:
         output = f"{title}:\n" f"{jde.doc}\n" f"{jde}\n"
-        import re
-
-        output = re.sub(r'("db_name":.* ")(\w*)(")', r"\1********\3", output)
-        return re.sub(r'("db_password":.* ")(\w*)(")', r"\1********\3", output)
+        output = DB_NAME_PATTERN.sub(r"\1********\3", output)
+        return DB_PASSWORD_PATTERN.sub(r"\1********\3", output)
 
     @property
     def sites(self):
@@ -782,22 +839,30 @@ class Bench(Base):
     def _sites(self, validate_configs=False) -> dict[str, Site]:
         sites = {}
         for directory in os.listdir(self.sites_directory):
-            try:
-                sites[directory] = Site(directory, self)
-            except json.decoder.JSONDecodeError as jde:
-                output = self.readable_jde_err(f"Error parsing JSON in {directory}", jde)
-                self.execute(
-                    f"echo '{output}';exit {int(validate_configs)}",
-                )  # exit 1 to make sure the job fails and shows output
-            except Exception:
-                pass
+            if site := self._load_site(directory, validate_configs):
+                sites[directory] = site
         return sites
 
-    def get_site(self, site):
+    def _load_site(self, name, validate_configs=False) -> Site | None:
         try:
-            return self.valid_sites[site]
-        except KeyError as exc:
-            raise SiteNotExistsException(site, self.name) from exc
+            return Site(name, self)
+        except json.decoder.JSONDecodeError as jde:
+            output = self.readable_jde_err(f"Error parsing JSON in {name}", jde)
+            self.execute(
+                f"echo '{output}';exit {int(validate_configs)}",
+            )  # exit 1 to make sure the job fails and shows output
+        except Exception:
+            pass
+        return None
+
+    def get_site(self, site):
+        # Only load the requested site instead of every site on the bench
+        _site = None
+        if site in os.listdir(self.sites_directory):
+            _site = self._load_site(site, validate_configs=True)
+        if not _site:
+            raise SiteNotExistsException(site, self.name)
+        return _site
 
     @property
     def step_record(self):
@@ -956,13 +1021,15 @@ class Bench(Base):
         exec(f"git fetch --depth 1 {remote} {new_hash}")
         diff: str = exec(f"git diff --name-only {old_hash} {new_hash}")["output"]
 
-        # Ensure repo is not dirty and checkout next_hash
-        exec(f"git reset --hard {old_hash}")
-        exec("git clean -fd")
-        exec(f"git checkout {new_hash}")
-
-        # Remove remote, url might be private
-        exec(f"git remote remove {remote}")
+        # Ensure repo is not dirty, checkout next_hash and remove remote (url
+        # might be private) in a single docker exec instead of one per command
+        commands = [
+            f"git reset --hard {old_hash}",
+            "git clean -fd",
+            f"git checkout {new_hash}",
+            f"git remote remove {remote}",
+        ]
+        exec(f"sh -c {quote(' && '.join(commands))}")
         return [s for s in diff.split("\n") if s]
 
     def set_git_remote(
@@ -1014,9 +1081,11 @@ class Bench(Base):
         res = get_execution_result()
         outputs: list[str] = []
 
+        # self.sites loads every site of the bench, do it once for all sites
+        bench_sites = self.sites
         for site_name in sites:
             migrate_res = self.migrate_site(
-                self.sites[site_name],
+                bench_sites[site_name],
                 skip_search_index,
                 skip_failing_patches,
             )
@@ -1224,18 +1293,30 @@ def _inactive_scheduler_sites(bench: Bench):
 
 
 def _inactive_web_sites(bench: Bench):
-    inactive = []
-    session = requests.Session()
-    for site in bench.sites:
+    def is_inactive(site: str) -> bool:
         url = f"https://{site}/api/method/ping"
         try:
-            result = session.get(url)
+            result = requests.get(url, timeout=10)
         except Exception as e:
             result = None
             print("Ping Failed", url, e)
-        if not result or result.status_code != 200:
-            inactive.append(site)
-    return inactive
+        return not result or result.status_code != 200
+
+    # Pings are independent and network bound, run them concurrently but
+    # without sending more at once than the bench's gunicorn workers can serve
+    max_workers = min(bench.bench_config.get("gunicorn_workers") or 1, 8)
+    sites = list(bench.sites)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        statuses = list(executor.map(is_inactive, sites))
+    return [site for site, inactive in zip(sites, statuses) if inactive]
+
+
+def _group_usage_by_site(usage_data: list[dict]) -> dict[str, list[dict]]:
+    # Single pass so each site doesn't rescan the entire usage data
+    usage_by_site: dict[str, list[dict]] = defaultdict(list)
+    for d in usage_data:
+        usage_by_site[d["site"]].append(d)
+    return usage_by_site
 
 
 def _get_domains(sites: list[Site]):
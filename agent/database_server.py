@@ -183,12 +183,21 @@ class DatabaseServer(Server):
 
     @step("Fetch Column Statistics")
     def _fetch_column_stats(self, schema, table, private_ip, mariadb_root_password):
-        """Get various stats about columns in a table.
+        """Get various stats about columns in one or more tables.
+
+        `table` can be a table name or a list of table names. Stats for all the
+        tables are fetched over a single connection with a single query.
 
         Refer:
             - https://mariadb.com/kb/en/engine-independent-table-statistics/
             - https://mariadb.com/kb/en/mysqlcolumn_stats-table/
         """
+        # Repeated tables would be analyzed and fetched again, keep each once
+        tables = list(dict.fromkeys([table] if isinstance(table, str) else table))
+        results = []
+        if not tables:
+            return {"output": json.dumps(results)}
+
         mariadb = MySQLDatabase(
             "mysql",
             user="root",
@@ -198,21 +207,23 @@ class DatabaseServer(Server):
         )
 
         try:
-            self.sql(
-                mariadb,
-                f"ANALYZE TABLE `{schema}`.`{table}` PERSISTENT FOR ALL",
-            )
+            for table_name in tables:
+                self.sql(
+                    mariadb,
+                    f"ANALYZE TABLE `{schema}`.`{table_name}` PERSISTENT FOR ALL",
+                )
 
+            placeholders = ", ".join(["%s"] * len(tables))
             results = self.sql(
                 mariadb,
-                """
+                f"""
                 SELECT
-                    column_name, nulls_ratio, avg_length, avg_frequency,
+                    table_name, column_name, nulls_ratio, avg_length, avg_frequency,
                     decode_histogram(hist_type,histogram) as histogram
                 from mysql.column_stats
                 WHERE db_name = %s
-                    and table_name = %s """,
-                (schema, table),
+                    and table_name IN ({placeholders}) """,
+                (schema, *tables),
             )
 
             for row in results:
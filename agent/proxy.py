@@ -209,8 +209,10 @@ class Proxy(Server):
 
     @job("Setup Redirects on Hosts")
     def setup_redirects_job(self, hosts, target):
+        # Drop duplicate hosts (keeping order) so each redirect is set up once
+        hosts = dict.fromkeys(hosts)
         if target in hosts:
-            hosts.remove(target)
+            del hosts[target]
             self.remove_redirect(target)
         for host in hosts:
             self.setup_redirect(host, target)
@@ -58,19 +58,15 @@ class Server(Base):
         self._render_template("bench/docker-compose.yml.jinja2", config, docker_compose)
 
         config_directory = os.path.join(bench_directory, "config")
-        command = (
-            "docker run --rm --net none "
-            f"-v {config_directory}:/home/frappe/frappe-bench/configmount "
-            f"{config['docker_image']} cp -LR config/. configmount"
-        )
-        self.execute(command, directory=bench_directory)
-
         sites_directory = os.path.join(bench_directory, "sites")
-        # Copy sites directory from image to host system
+        # Copy config and sites directories from image to host system
+        # using a single container instead of starting one per directory
         command = (
             "docker run --rm --net none "
+            f"-v {config_directory}:/home/frappe/frappe-bench/configmount "
             f"-v {sites_directory}:/home/frappe/frappe-bench/sitesmount "
-            f"{config['docker_image']} cp -LR sites/. sitesmount"
+            f"{config['docker_image']} "
+            "sh -c 'cp -LR config/. configmount && cp -LR sites/. sitesmount'"
         )
         return self.execute(command, directory=bench_directory)
 
@@ -442,9 +438,12 @@ class Server(Base):
         return benches
 
     def get_bench(self, bench):
+        # Only load the requested bench instead of every bench on the server
+        if bench not in os.listdir(self.benches_directory):
+            raise BenchNotExistsException(bench)
         try:
-            return self.benches[bench]
-        except KeyError as exc:
+            return Bench(bench, self)
+        except Exception as exc:
             raise BenchNotExistsException(bench) from exc
 
     @property
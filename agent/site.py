@@ -41,10 +41,12 @@ class Site(Base):
         if not os.path.exists(self.config_file):
             raise OSError(f"Path {self.config_file} does not exist")
 
-        self.database = self.config["db_name"]
-        self.user = self.config["db_name"]
-        self.password = self.config["db_password"]
-        self.host = self.config.get("db_host", self.bench.host)
+        # self.config re-reads and parses site_config.json on every access
+        config = self.config
+        self.database = config["db_name"]
+        self.user = config["db_name"]
+        self.password = config["db_password"]
+        self.host = config.get("db_host", self.bench.host)
 
     def bench_execute(self, command, input=None):
         return self.bench.docker_execute(f"bench --site {self.name} {command}", input=input)
@@ -272,9 +274,10 @@ class Site(Base):
             f"GRANT {privileges} ON {database}.* TO '{user}'@'%'",
             "FLUSH PRIVILEGES",
         ]
-        for query in queries:
-            command = f"mysql -h {self.host} -uroot -p{mariadb_root_password}" f' -e "{query}"'
-            self.execute(command)
+        # Run all statements over a single connection
+        query = "; ".join(queries)
+        command = f"mysql -h {self.host} -uroot -p{mariadb_root_password}" f' -e "{query}"'
+        self.execute(command)
         return {"database": database, "user": user, "password": password}
 
     def revoke_database_access_credentials(self, user, mariadb_root_password):
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+import unittest
+from unittest.mock import patch
+
+from agent.database_server import DatabaseServer
+
+
+class TestDatabaseServer(unittest.TestCase):
+    """Tests for class methods of DatabaseServer."""
+
+    def _get_fake_database_server(self) -> DatabaseServer:
+        with patch.object(DatabaseServer, "__init__", new=lambda x: None):
+            return DatabaseServer()
+
+    def test_fetch_column_stats_fetches_all_tables_in_one_query(self):
+        """Ensure stats of all tables are fetched with a single select on one connection"""
+        server = self._get_fake_database_server()
+        rows = [
+            {
+                "table_name": "tabUser",
+                "column_name": "name",
+                "nulls_ratio": "0.0000",
+                "avg_length": "12.5000",
+                "avg_frequency": "1.0000",
+                "histogram": None,
+            },
+            {
+                "table_name": "tabRole",
+                "column_name": "role_name",
+                "nulls_ratio": None,
+                "avg_length": "8.0000",
+                "avg_frequency": "1.0000",
+                "histogram": None,
+            },
+        ]
+        with patch.object(
+            DatabaseServer, "_fetch_column_stats", new=DatabaseServer._fetch_column_stats.__wrapped__
+        ), patch("agent.database_server.MySQLDatabase") as mysql_database, patch.object(
+            DatabaseServer, "sql", side_effect=[[], [], rows]
+        ) as sql:
+            output = server._fetch_column_stats("_db", ["tabUser", "tabRole", "tabUser"], "10.0.0.1", "root")
+
+        mysql_database.assert_called_once()
+        self.assertEqual(sql.call_count, 3)
+        self.assertIn("ANALYZE TABLE `_db`.`tabUser`", sql.call_args_list[0].args[1])
+        self.assertIn("ANALYZE TABLE `_db`.`tabRole`", sql.call_args_list[1].args[1])
+        self.assertIn("table_name IN (%s, %s)", sql.call_args_list[2].args[1])
+        self.assertEqual(sql.call_args_list[2].args[2], ("_db", "tabUser", "tabRole"))
+
+        stats = json.loads(output["output"])
+        self.assertEqual(stats[0]["avg_length"], 12.5)
+        self.assertIsNone(stats[1]["nulls_ratio"])
@@ -165,6 +165,22 @@ class TestProxy(unittest.TestCase):
         redir_file = os.path.join(host_dir, "redirect.json")
         self.assertFalse(os.path.exists(redir_file))
 
+    def test_setup_redirects_skips_target_and_duplicate_hosts(self):
+        """Ensure setup redirects job sets up each host once and never the target"""
+        proxy = self._get_fake_proxy()
+        hosts = [self.domain_2, self.domain_1, self.domain_2, self.domain_1]
+        with patch.object(
+            Proxy, "setup_redirects_job", new=Proxy.setup_redirects_job.__wrapped__
+        ), patch.object(Proxy, "setup_redirect") as setup_redirect, patch.object(
+            Proxy, "remove_redirect"
+        ) as remove_redirect, patch.object(Proxy, "generate_proxy_config"), patch.object(
+            Proxy, "reload_nginx"
+        ):
+            proxy.setup_redirects_job(hosts, self.domain_1)
+
+        remove_redirect.assert_called_once_with(self.domain_1)
+        setup_redirect.assert_called_once_with(self.domain_2, self.domain_1)
+
     def test_rename_on_site_host_renames_host_directory(self):
         """Ensure rename site renames host directory."""
         proxy = self._get_fake_proxy()
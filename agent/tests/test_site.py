@@ -4,7 +4,8 @@ import json
 import os
 import shutil
 import unittest
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import PropertyMock, patch
 
 from agent.base import AgentException
 from agent.bench import Bench
@@ -124,3 +125,83 @@ class TestSite(unittest.TestCase):
             bench.valid_sites[site_name]
         except KeyError:
             self.fail("Site not found in bench.sites")
+
+    def test_retrieve_log_only_reads_files_in_logs_directory(self):
+        bench = self._get_test_bench()
+        site_name = "test-site.frappe.cloud"
+        self._create_test_site(site_name)
+        self._make_site_config(site_name)
+        site = Site(site_name, bench)
+
+        self.assertEqual(site.retrieve_log("frappe.log"), "")
+
+        os.makedirs(site.logs_directory)
+        with open(os.path.join(site.logs_directory, "frappe.log"), "w") as f:
+            f.write("log line")
+
+        self.assertEqual(site.retrieve_log("frappe.log"), "log line")
+        self.assertEqual(site.retrieve_log("../site_config.json"), "")
+
+    def test_set_sites_host_uses_most_specific_wildcard(self):
+        bench = self._get_test_bench()
+        sites = [
+            SimpleNamespace(name="a.frappe.cloud", host=None),
+            SimpleNamespace(name="a.eu.frappe.cloud", host=None),
+            SimpleNamespace(name="a.example.com", host=None),
+        ]
+        with patch.object(Server, "wildcards", new_callable=PropertyMock) as wildcards:
+            wildcards.return_value = ["frappe.cloud", "eu.frappe.cloud"]
+            bench._set_sites_host(sites)
+
+        self.assertEqual(sites[0].host, "*.frappe.cloud")
+        self.assertEqual(sites[1].host, "*.eu.frappe.cloud")
+        self.assertIsNone(sites[2].host)
+
+    def test_fetch_database_table_schema_parses_mysql_batch_output(self):
+        bench = self._get_test_bench()
+        site_name = "test-site.frappe.cloud"
+        self._create_test_site(site_name)
+        self._make_site_config(site_name)
+        site = Site(site_name, bench)
+
+        indexes_output = "tabUser\tname\tPRIMARY\ntabUser\temail\temail\ntabUser\temail\temail_name"
+        columns_output = "\n".join(
+            [
+                "tabUser\tname\tvarchar\tNO\tNULL",
+                "tabUser\temail\tvarchar\tYES\tNULL",
+                "tabUser\tenabled\tint\tNO\t1",
+            ]
+        )
+        with patch.object(
+            Site, "_fetch_database_table_schema", new=Site._fetch_database_table_schema.__wrapped__
+        ), patch.object(
+            Site, "execute", side_effect=[{"output": indexes_output}, {"output": columns_output}]
+        ):
+            tables = site._fetch_database_table_schema()
+
+        self.assertEqual(
+            tables["tabUser"],
+            [
+                {
+                    "column": "name",
+                    "data_type": "varchar",
+                    "is_nullable": False,
+                    "default": "NULL",
+                    "indexes": ["PRIMARY"],
+                },
+                {
+                    "column": "email",
+                    "data_type": "varchar",
+                    "is_nullable": True,
+                    "default": "NULL",
+                    "indexes": ["email", "email_name"],
+                },
+                {
+                    "column": "enabled",
+                    "data_type": "int",
+                    "is_nullable": False,
+                    "default": "1",
+                    "indexes": [],
+                },
+            ],
+        )
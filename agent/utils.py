@@ -65,6 +65,9 @@ def get_size(folder):
 
 def cint(x):
     """Convert to integer"""
+    if type(x) is int:
+        # Common case, skip the float round trip
+        return x
     try:
         num = int(float(x))
     except Exception: